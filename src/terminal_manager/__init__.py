@@ -14,7 +14,9 @@ from .event import Event
 from .manager import (
     DEFAULT_ALLOW_TURN_OFF,
     DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_MAX_CONCURRENT_COMMANDS,
     DEFAULT_NAME,
+    DEFAULT_PIPELINE_COMMANDS,
     CommandOutput,
     Manager,
 )
@@ -36,7 +38,9 @@ __all__ = [
     "Event",
     "DEFAULT_ALLOW_TURN_OFF",
     "DEFAULT_COMMAND_TIMEOUT",
+    "DEFAULT_MAX_CONCURRENT_COMMANDS",
     "DEFAULT_NAME",
+    "DEFAULT_PIPELINE_COMMANDS",
     "CommandOutput",
     "Manager",
     "BinarySensor",
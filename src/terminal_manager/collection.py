@@ -1,14 +1,25 @@
 from __future__ import annotations
 
-from copy import deepcopy
+from collections.abc import Mapping
+from types import MappingProxyType
 
 from .command import ActionCommand, Command, SensorCommand
+from .errors import CommandLoopError, InvalidSensorError
 from .sensor import Sensor
 
 
 class Collection:
-    action_commands: list[ActionCommand]
-    sensor_commands: list[SensorCommand]
+    __slots__ = (
+        "name",
+        "_sensor_commands",
+        "_commands",
+        "_action_commands_by_key",
+        "_sensor_commands_by_id",
+        "_sensor_keys_by_command_id",
+        "_sensor_commands_by_sensor_key",
+        "_sensors_by_key",
+        "_sensor_index_version",
+    )
 
     def __init__(
         self,
@@ -17,68 +28,243 @@ class Collection:
         sensor_commands: list[SensorCommand] | None = None,
     ) -> None:
         self.name = name
+        self._commands: tuple[Command, ...] | None = None
+        self._sensor_commands: tuple[SensorCommand, ...] | None = None
+        self._action_commands_by_key: dict[str, ActionCommand] = {}
+        self._sensor_commands_by_id: dict[int, SensorCommand] = {}
+        self._sensor_keys_by_command_id: dict[int, tuple[str, ...]] = {}
+        self._sensor_commands_by_sensor_key: dict[str, SensorCommand] = {}
+        self._sensors_by_key: dict[str, Sensor] = {}
+        self._sensor_index_version = 0
         self.set_action_commands(action_commands or [])
         self.set_sensor_commands(sensor_commands or [])
         self.check()
 
     @property
-    def commands(self) -> list[Command]:
-        return [*self.action_commands, *self.sensor_commands]
+    def commands(self) -> tuple[Command, ...]:
+        if self._commands is None:
+            self._commands = (
+                *self._action_commands_by_key.values(),
+                *self._sensor_commands_tuple,
+            )
+
+        return self._commands
+
+    @property
+    def _sensor_commands_tuple(self) -> tuple[SensorCommand, ...]:
+        if self._sensor_commands is None:
+            self._sensor_commands = tuple(self._sensor_commands_by_id.values())
+
+        return self._sensor_commands
+
+    @property
+    def action_commands(self) -> tuple[ActionCommand, ...]:
+        """Action commands.
+
+        A tuple, use `add_action_command` and `remove_action_command`
+        to change them. Assigning a list calls `set_action_commands`.
+        """
+        return tuple(self._action_commands_by_key.values())
+
+    @action_commands.setter
+    def action_commands(self, action_commands: list[ActionCommand]) -> None:
+        self.set_action_commands(action_commands)
+
+    @property
+    def sensor_commands(self) -> tuple[SensorCommand, ...]:
+        """Sensor commands.
+
+        A tuple, use `add_sensor_command` and `remove_sensor` to change
+        them. Assigning a list calls `set_sensor_commands`.
+        """
+        return self._sensor_commands_tuple
+
+    @sensor_commands.setter
+    def sensor_commands(self, sensor_commands: list[SensorCommand]) -> None:
+        self.set_sensor_commands(sensor_commands)
+
+    @property
+    def action_commands_by_key(self) -> Mapping[str, ActionCommand]:
+        return MappingProxyType(self._action_commands_by_key)
 
     @property
-    def action_commands_by_key(self) -> dict[str, ActionCommand]:
-        return {command.key: command for command in self.action_commands}
+    def sensor_commands_by_sensor_key(self) -> Mapping[str, SensorCommand]:
+        return MappingProxyType(self._sensor_commands_by_sensor_key)
 
     @property
-    def sensor_commands_by_sensor_key(self) -> dict[str, SensorCommand]:
-        return {
-            key: command
-            for command in self.sensor_commands
-            for key in command.sensors_by_key
-        }
+    def sensors_by_key(self) -> Mapping[str, Sensor]:
+        return MappingProxyType(self._sensors_by_key)
 
     @property
-    def sensors_by_key(self) -> dict[str, Sensor]:
-        return {
-            key: sensor
-            for command in self.sensor_commands
-            for key, sensor in command.sensors_by_key.items()
-        }
+    def sensor_index_version(self) -> int:
+        """Number that changes whenever the sensor index changes."""
+        return self._sensor_index_version
+
+    def _index_sensor_command(self, command: SensorCommand) -> None:
+        sensors_by_key = command.sensors_by_key
+        self._sensor_keys_by_command_id[id(command)] = tuple(sensors_by_key)
+        self._sensor_commands_by_sensor_key.update(
+            dict.fromkeys(sensors_by_key, command)
+        )
+        self._sensors_by_key.update(sensors_by_key)
+        self._sensor_index_version += 1
+
+    def _unindex_sensor_command(self, command: SensorCommand) -> None:
+        keys = self._sensor_keys_by_command_id.pop(id(command))
+        self._sensor_index_version += 1
+
+        for key in keys:
+            del self._sensor_commands_by_sensor_key[key]
+            del self._sensors_by_key[key]
+
+    def _add_action_command(self, command: ActionCommand) -> ActionCommand:
+        if command.key in self._action_commands_by_key:
+            self.remove_action_command(command.key)
+
+        command = command.clone()
+        self._action_commands_by_key[command.key] = command
+        self._commands = None
+        return command
+
+    def _add_sensor_command(self, command: SensorCommand) -> SensorCommand:
+        for sensor in command.sensors:
+            if sensor.key in self._sensors_by_key:
+                self.remove_sensor(sensor.key)
+
+        command = command.clone()
+        self._sensor_commands_by_id[id(command)] = command
+        self._sensor_commands = None
+        self._commands = None
+        self._index_sensor_command(command)
+        return command
+
+    def _remove_sensor_command(self, command: SensorCommand) -> None:
+        del self._sensor_commands_by_id[id(command)]
+        self._sensor_commands = None
+        self._commands = None
+        self._unindex_sensor_command(command)
+
+    def _restore_sensor_commands(
+        self,
+        sensor_commands_by_id: dict[int, SensorCommand],
+        sensors_by_command_id: dict[int, list[Sensor]],
+    ) -> None:
+        for command_id, sensors in sensors_by_command_id.items():
+            command = sensor_commands_by_id[command_id]
+            command.sensors[:] = sensors
+            command._update_sensors_by_key()
+            if command_id in self._sensor_keys_by_command_id:
+                self._unindex_sensor_command(command)
+            self._index_sensor_command(command)
+
+        self._sensor_commands_by_id.clear()
+        self._sensor_commands_by_id.update(sensor_commands_by_id)
+        self._sensor_commands = None
+        self._commands = None
 
     def set_action_commands(self, action_commands: list[ActionCommand]) -> None:
-        """Set the action commands."""
-        self.action_commands = []
+        """Set the action commands without checking them."""
+        self._commands = None
+        self._action_commands_by_key.clear()
 
         for command in action_commands:
-            self.add_action_command(command)
+            self._add_action_command(command)
 
     def set_sensor_commands(self, sensor_commands: list[SensorCommand]) -> None:
-        """Set the sensor commands."""
-        self.sensor_commands = []
+        """Set the sensor commands without checking them."""
+        self._sensor_commands = None
+        self._commands = None
+        self._sensor_commands_by_id.clear()
+        self._sensor_keys_by_command_id.clear()
+        self._sensor_commands_by_sensor_key.clear()
+        self._sensors_by_key.clear()
+        self._sensor_index_version += 1
 
         for command in sensor_commands:
-            self.add_sensor_command(command)
+            self._add_sensor_command(command)
 
-    def add_action_command(self, command: ActionCommand) -> None:
-        """Add an action command.
+    def add_action_command(self, command: ActionCommand, check: bool = True) -> None:
+        """Add and check an action command.
 
         Remove existing action command with the same key.
+        If the check fails, the collection is left unchanged.
+        Use `check=False` to add commands that depend on each other
+        one by one and call `check` afterwards.
+
+        Raises:
+            InvalidSensorError
+            CommandLoopError
+
         """
-        if command.key in self.action_commands_by_key:
-            self.remove_action_command(command.key)
+        action_commands_by_key = None
 
-        self.action_commands.append(deepcopy(command))
+        if check and command.key in self._action_commands_by_key:
+            action_commands_by_key = dict(self._action_commands_by_key)
 
-    def add_sensor_command(self, command: SensorCommand) -> None:
-        """Add a sensor command.
+        command = self._add_action_command(command)
+
+        if not check:
+            return
+
+        try:
+            command.check(self)
+        except (InvalidSensorError, CommandLoopError):
+            self.remove_action_command(command.key)
+            if action_commands_by_key:
+                self._action_commands_by_key.clear()
+                self._action_commands_by_key.update(action_commands_by_key)
+            raise
+
+    def add_sensor_command(self, command: SensorCommand, check: bool = True) -> None:
+        """Add and check a sensor command.
 
         Remove existing sensors with the same keys.
+        If the check fails, the collection is left unchanged.
+        Use `check=False` to add commands that depend on each other
+        one by one and call `check` afterwards.
+
+        Raises:
+            InvalidSensorError
+            CommandLoopError
+
         """
-        for sensor in command.sensors:
-            if sensor.key in self.sensors_by_key:
-                self.remove_sensor(sensor.key)
+        sensors_by_command_id = {}
+        sensor_commands_by_id = None
+
+        if check:
+            for sensor in command.sensors:
+                if old_command := self._sensor_commands_by_sensor_key.get(sensor.key):
+                    sensors_by_command_id[id(old_command)] = [*old_command.sensors]
+
+        if sensors_by_command_id:
+            sensor_commands_by_id = dict(self._sensor_commands_by_id)
+
+        command = self._add_sensor_command(command)
+
+        if not check:
+            return
+
+        try:
+            command.check(self)
+        except (InvalidSensorError, CommandLoopError):
+            self._remove_sensor_command(command)
+            if sensor_commands_by_id:
+                self._restore_sensor_commands(
+                    sensor_commands_by_id, sensors_by_command_id
+                )
+            raise
+
+    def reindex_sensor_command(self, command: SensorCommand) -> None:
+        """Reindex the sensors of a sensor command.
+
+        Needed after child sensors have been added or removed.
+        Commands that are not in the collection are ignored.
+        """
+        if id(command) not in self._sensor_commands_by_id:
+            return
 
-        self.sensor_commands.append(deepcopy(command))
+        self._unindex_sensor_command(command)
+        self._index_sensor_command(command)
 
     def get_action_command(self, key: str) -> ActionCommand:
         """Get an action command.
@@ -87,7 +273,7 @@ class Collection:
             KeyError
 
         """
-        return self.action_commands_by_key[key]
+        return self._action_commands_by_key[key]
 
     def get_sensor_command(self, key: str) -> SensorCommand:
         """Get a sensor command.
@@ -96,7 +282,7 @@ class Collection:
             KeyError
 
         """
-        return self.sensor_commands_by_sensor_key[key]
+        return self._sensor_commands_by_sensor_key[key]
 
     def get_sensor(self, key: str) -> Sensor:
         """Get a sensor.
@@ -105,7 +291,7 @@ class Collection:
             KeyError
 
         """
-        return self.sensors_by_key[key]
+        return self._sensors_by_key[key]
 
     def remove_action_command(self, key: str) -> None:
         """Remove an action command.
@@ -114,8 +300,8 @@ class Collection:
             KeyError
 
         """
-        command = self.get_action_command(key)
-        self.action_commands.remove(command)
+        del self._action_commands_by_key[key]
+        self._commands = None
 
     def remove_sensor(self, key: str) -> None:
         """Remove a sensor.
@@ -129,8 +315,10 @@ class Collection:
         command = self.get_sensor_command(key)
         command.remove_sensor(key)
 
-        if not command.sensors_by_key:
-            self.sensor_commands.remove(command)
+        if command.sensors_by_key:
+            self.reindex_sensor_command(command)
+        else:
+            self._remove_sensor_command(command)
 
     def check(self) -> None:
         """Check commands."""
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
+from copy import copy
 from dataclasses import KW_ONLY, dataclass, field
+from functools import lru_cache
 import re
 from string import Template
+import sys
 from time import time
+from types import MappingProxyType
 from typing import TYPE_CHECKING
 
 from .errors import CommandError, CommandLoopError, InvalidSensorError
-from .helpers import name_to_key
+from .helpers import intern_key, name_to_key
 from .sensor import Sensor
 
 if TYPE_CHECKING:
@@ -61,7 +65,43 @@ class VariableTemplate(Template):
     """
 
 
+PLACEHOLDER_PATTERN = re.compile(
+    rf"([{re.escape(VARIABLE_DELIMITER)}{re.escape(SENSOR_DELIMITER)}])"
+    rf"{{({Template.idpattern})}}",
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=4096)
+def _parse_string(
+    string: str,
+) -> tuple[tuple[tuple[str | None, str], ...], frozenset[str], frozenset[str]]:
+    """Parse a command string into segments, variables and sensors."""
+    segments = []
+    keys_by_delimiter = {VARIABLE_DELIMITER: set(), SENSOR_DELIMITER: set()}
+    position = 0
+
+    for match in PLACEHOLDER_PATTERN.finditer(string):
+        delimiter, key = match.groups()
+        if literal := string[position : match.start()]:
+            segments.append((None, literal))
+        segments.append((delimiter, key))
+        keys_by_delimiter[delimiter].add(key)
+        position = match.end()
+
+    if literal := string[position:]:
+        segments.append((None, literal))
+
+    return (
+        tuple(segments),
+        frozenset(keys_by_delimiter[VARIABLE_DELIMITER]),
+        frozenset(keys_by_delimiter[SENSOR_DELIMITER]),
+    )
+
+
 class DynamicData:
+    __slots__ = ("id", "key", "name", "data")
+
     def __init__(
         self,
         sensor: Sensor,
@@ -71,7 +111,7 @@ class DynamicData:
     ) -> None:
         self.id = id_field.strip()
         name = name_field.strip() if name_field else self.id
-        self.key = f"{sensor.key}_{name_to_key(self.id)}"
+        self.key = sys.intern(f"{sensor.key}_{name_to_key(self.id)}")
         self.name = f"{sensor.name} {name}" if sensor.name else name
         self.data = data_field
 
@@ -84,15 +124,33 @@ class Command:
     renderer: Callable[[str], str] | None = None
     _linked_sensors: set[str] = field(default_factory=set, init=False, repr=False)
 
+    def __post_init__(self):
+        self._parse()
+        self._checked: tuple[Collection, int, frozenset[str]] | None = None
+
+    def _parse(self) -> None:
+        (
+            self._segments,
+            self._required_variables,
+            self._required_sensors,
+        ) = _parse_string(self.string)
+        self._parsed_string = self.string
+
     @property
-    def required_variables(self) -> set[str]:
+    def required_variables(self) -> frozenset[str]:
         """Variables required to render the command string."""
-        return set(VariableTemplate(self.string).get_identifiers())
+        if self._parsed_string is not self.string:
+            self._parse()
+
+        return self._required_variables
 
     @property
-    def required_sensors(self) -> set[str]:
+    def required_sensors(self) -> frozenset[str]:
         """Sensors required to render the command string."""
-        return set(SensorTemplate(self.string).get_identifiers())
+        if self._parsed_string is not self.string:
+            self._parse()
+
+        return self._required_sensors
 
     @property
     def linked_sensors(self) -> set[str]:
@@ -100,9 +158,29 @@ class Command:
         return self._linked_sensors
 
     @property
-    def sub_sensors(self) -> set[str]:
+    def sub_sensors(self) -> frozenset[str]:
         """Set of required and linked sensors."""
-        return {*self.required_sensors, *self.linked_sensors}
+        if linked_sensors := self.linked_sensors:
+            return self.required_sensors.union(linked_sensors)
+
+        return self.required_sensors
+
+    def _substitute(
+        self,
+        variables: Mapping[str, object],
+        sensor_values_by_key: Mapping[str, object],
+    ) -> str:
+        if self._parsed_string is not self.string:
+            self._parse()
+
+        values_by_delimiter = {
+            VARIABLE_DELIMITER: variables,
+            SENSOR_DELIMITER: sensor_values_by_key,
+        }
+        return "".join(
+            text if delimiter is None else str(values_by_delimiter[delimiter][text])
+            for delimiter, text in self._segments
+        )
 
     def _render(self, string: str) -> str:
         if self.renderer:
@@ -110,6 +188,13 @@ class Command:
 
         return string
 
+    def clone(self) -> Command:
+        """Clone without sharing mutable state."""
+        clone = copy(self)
+        clone._linked_sensors = {*self._linked_sensors}
+        clone._checked = None
+        return clone
+
     def check(self, collection: Collection) -> None:
         """Check configuration.
 
@@ -118,30 +203,43 @@ class Command:
             CommandLoopError
 
         """
+        if not self.sub_sensors:
+            return
+
         commands_by_key = collection.sensor_commands_by_sensor_key
-        commands = []
-
-        def detect_loop(command: Command) -> None:
-            sub_commands = []
-            if command not in commands:
-                commands.append(command)
-            for key in command.sub_sensors:
-                if key not in commands_by_key:
-                    continue
-                if (sub_command := commands_by_key[key]) in commands:
+        sensor_keys = commands_by_key.keys()
+        visiting = {id(self)}
+        visited = set()
+        stack = [(self, iter(sensor_keys & self.sub_sensors))]
+
+        while stack:
+            command, keys = stack[-1]
+            for key in keys:
+                sub_command = commands_by_key[key]
+                if id(sub_command) in visiting:
                     raise CommandLoopError(key)
-                if sub_command not in sub_commands:
-                    sub_commands.append(sub_command)
-                    detect_loop(sub_command)
-
-        detect_loop(self)
+                if id(sub_command) not in visited:
+                    visiting.add(id(sub_command))
+                    stack.append(
+                        (sub_command, iter(sensor_keys & sub_command.sub_sensors))
+                    )
+                    break
+            else:
+                stack.pop()
+                visiting.remove(id(command))
+                visited.add(id(command))
 
-    async def async_execute(
+    async def async_render(
         self,
         manager: Manager,
         variables: dict | None = None,
-    ) -> CommandOutput:
-        """Execute.
+        *,
+        polled_sensors: Mapping[str, Sensor] | None = None,
+    ) -> str:
+        """Render the command string.
+
+        Required sensors are polled unless all of them are
+        in `polled_sensors`.
 
         Raises:
             CommandError
@@ -151,40 +249,64 @@ class Command:
         sensor_values_by_key = {}
         string = self.string
 
-        try:
-            self.check(manager)
-        except (CommandLoopError, InvalidSensorError) as exc:
-            raise CommandError("Command check failed", exc) from exc
+        checked = (manager, manager.sensor_index_version, self.sub_sensors)
 
-        try:
-            string = VariableTemplate(string).substitute(variables)
-        except Exception as exc:
-            raise CommandError("Failed to substitute variable", exc) from exc
+        if self._checked != checked:
+            try:
+                self.check(manager)
+            except (CommandLoopError, InvalidSensorError) as exc:
+                raise CommandError("Command check failed", exc) from exc
+            self._checked = checked
 
-        try:
-            sensors = await manager.async_poll_sensors(self.required_sensors)
-        except Exception as exc:
-            raise CommandError("Failed to poll required sensors", exc) from exc
+        for key in self.required_variables:
+            if key not in variables:
+                exc = KeyError(key)
+                raise CommandError("Failed to substitute variable", exc) from exc
 
-        for sensor in sensors:
-            if sensor.value is not None:
-                sensor_values_by_key[sensor.key] = sensor.value
+        if required_sensors := self.required_sensors:
+            if polled_sensors and required_sensors <= polled_sensors.keys():
+                sensors = [polled_sensors[key] for key in required_sensors]
             else:
-                raise CommandError(f"Value of required sensor {sensor.key} is None")
-
-        try:
-            string = SensorTemplate(string).substitute(sensor_values_by_key)
-        except Exception as exc:
-            raise CommandError("Failed to substitute sensor", exc) from exc
+                try:
+                    sensors = await manager.async_poll_sensors(required_sensors)
+                except Exception as exc:
+                    raise CommandError("Failed to poll required sensors", exc) from exc
+
+            for sensor in sensors:
+                if sensor.value is not None:
+                    sensor_values_by_key[sensor.key] = sensor.value
+                else:
+                    raise CommandError(f"Value of required sensor {sensor.key} is None")
+
+        if self.required_variables or required_sensors:
+            try:
+                string = self._substitute(variables, sensor_values_by_key)
+            except Exception as exc:
+                raise CommandError("Failed to substitute placeholders", exc) from exc
 
         try:
-            string = self._render(string)
+            return self._render(string)
         except Exception as exc:
             raise CommandError("Failed to render string", exc) from exc
 
-        output = await manager.async_execute_command_string(string, self.timeout)
+    async def async_execute(
+        self,
+        manager: Manager,
+        variables: dict | None = None,
+    ) -> CommandOutput:
+        """Execute.
 
-        await manager.async_poll_sensors(self.linked_sensors, raise_errors=True)
+        Raises:
+            CommandError
+
+        """
+        string = await self.async_render(manager, variables)
+
+        async with manager.semaphore:
+            output = await manager.async_execute_command_string(string, self.timeout)
+
+        if linked_sensors := self.linked_sensors:
+            await manager.async_poll_sensors(linked_sensors, raise_errors=True)
 
         return output
 
@@ -197,7 +319,13 @@ class ActionCommand(Command):
     attributes: dict = field(default_factory=dict)
 
     def __post_init__(self):
-        self.key = self.key or name_to_key(self.name)
+        super().__post_init__()
+        self.key = intern_key(self.key) if self.key else name_to_key(self.name)
+
+    def clone(self) -> ActionCommand:
+        clone: ActionCommand = super().clone()
+        clone.attributes = {**self.attributes}
+        return clone
 
 
 @dataclass
@@ -208,38 +336,60 @@ class SensorCommand(Command):
     sensors: list[Sensor] = field(default_factory=list)
 
     def __post_init__(self):
+        super().__post_init__()
         self.last_update: float | None = None
+        self._update_sensors_by_key()
 
     @property
-    def linked_sensors(self) -> set[str]:
-        linked_sensors = {*self._linked_sensors}
-
-        for sensor in self.sensors:
-            linked_sensors.update(sensor.linked_sensors)
-
-        return {key for key in linked_sensors if key not in self.sensors_by_key}
+    def linked_sensors(self) -> frozenset[str]:
+        return (
+            frozenset(self._linked_sensors)
+            .union(*(sensor.linked_sensors for sensor in self.sensors))
+            .difference(self._sensors_by_key)
+        )
+
+    def clone(self) -> SensorCommand:
+        clone: SensorCommand = super().clone()
+        clone.sensors = [sensor.clone() for sensor in self.sensors]
+        clone._update_sensors_by_key()
+        return clone
 
     @property
-    def should_update(self) -> bool:
+    def next_update(self) -> float | None:
+        """Time when the `interval` has passed."""
         if not self.interval:
-            return False
+            return None
 
         if not self.last_update:
-            return True
+            return 0
 
-        if time() - self.last_update < self.interval:
+        return self.last_update + self.interval
+
+    @property
+    def should_update(self) -> bool:
+        if (next_update := self.next_update) is None:
             return False
 
-        return True
+        return time() >= next_update
 
     @property
-    def sensors_by_key(self) -> dict[str, Sensor]:
-        return {
-            sensor.key: sensor
-            for command_sensor in self.sensors
-            for sensor in (command_sensor, *command_sensor.child_sensors)
-            if command_sensor.key != PLACEHOLDER_KEY
-        }
+    def sensors_by_key(self) -> Mapping[str, Sensor]:
+        return MappingProxyType(self._sensors_by_key)
+
+    def _update_sensors_by_key(self) -> None:
+        sensors_by_key = {}
+
+        for sensor in self.sensors:
+            if sensor.key == PLACEHOLDER_KEY:
+                continue
+            sensors_by_key[sensor.key] = sensor
+            for child in sensor.child_sensors:
+                sensors_by_key[child.key] = child
+
+        self._sensors_by_key = sensors_by_key
+        self._dyn_start = next(
+            (i for i, sensor in enumerate(self.sensors) if sensor.dynamic), None
+        )
 
     def check(self, collection: Collection) -> None:
         """Check command configuration.
@@ -262,10 +412,11 @@ class SensorCommand(Command):
 
     def remove_sensor(self, key: str) -> None:
         """Remove a sensor."""
-        self.sensors = [
-            Sensor(key=PLACEHOLDER_KEY) if sensor.key == key else sensor
-            for sensor in self.sensors
-        ]
+        for i, sensor in enumerate(self.sensors):
+            if sensor.key == key:
+                self.sensors[i] = Sensor(key=PLACEHOLDER_KEY)
+                self._update_sensors_by_key()
+                return
 
     def update_sensors(self, manager: Manager, output: CommandOutput | None) -> None:
         """Update the sensors."""
@@ -275,35 +426,46 @@ class SensorCommand(Command):
         else:
             data = []
 
-        dyn_start = None
+        sensors = self.sensors
+        data_count = len(data)
+        dyn_start = self._dyn_start
 
-        for i, sensor in enumerate(self.sensors):
-            if sensor.dynamic:
-                dyn_start = i
-                break
-            sensor_data = data[i] if len(data) > i else None
-            sensor.update(manager, sensor_data)
+        for i in range(len(sensors) if dyn_start is None else dyn_start):
+            sensors[i].update(manager, data[i] if i < data_count else None)
 
         if dyn_start is None:
             return
 
-        dyn_data = data[dyn_start:]
-        dyn_sensors = self.sensors[dyn_start:]
+        dyn_sensors = sensors[dyn_start:]
         dyn_count = len(dyn_sensors)
+        name_index = dyn_count + 1
+        max_split = name_index + 1
+        separator = self.separator
+        child_keys = [sensor.child_sensors_by_key.keys() for sensor in dyn_sensors]
+        dyn_fields = [
+            (
+                fields[0],
+                fields,
+                fields[name_index] if len(fields) > name_index else None,
+            )
+            for line in data[dyn_start:]
+            if len(fields := line.split(separator, max_split)) > dyn_count
+        ]
 
-        for i, sensor in enumerate(dyn_sensors):
+        for i, sensor in enumerate(dyn_sensors, 1):
             sensor_data = [
-                DynamicData(
-                    sensor,
-                    fields[0],
-                    fields[i + 1],
-                    fields[dyn_count + 1] if len(fields) > dyn_count + 1 else None,
-                )
-                for line in dyn_data
-                if len(fields := line.split(self.separator)) > dyn_count
+                DynamicData(sensor, id_field, fields[i], name_field)
+                for id_field, fields, name_field in dyn_fields
             ] or None
             sensor.update(manager, sensor_data or None)
 
+        if any(
+            sensor.child_sensors_by_key.keys() != keys
+            for sensor, keys in zip(dyn_sensors, child_keys)
+        ):
+            self._update_sensors_by_key()
+            manager.reindex_sensor_command(self)
+
     async def async_execute(
         self,
         manager: Manager,
@@ -25,8 +25,8 @@ linux = Collection(
     [
         # TODO: OS_ARCHITECTURE
         SensorCommand(
-            "x=$(/sbin/ip route show default 2>/dev/null) && awk '{print $5}' <<<$x || "
-            "x=$(/sbin/route -n 2>/dev/null) && awk '/^0.0.0.0/ {print $NF}' <<<$x",
+            'awk \'$2 == "00000000" && $8 == "00000000" {print $1; exit}\' '
+            "/proc/net/route",
             sensors=[
                 TextSensor(
                     SensorName.NETWORK_INTERFACE,
@@ -44,7 +44,8 @@ linux = Collection(
             ],
         ),
         SensorCommand(
-            "cat /sys/class/net/&{network_interface}/device/power/wakeup",
+            "cat /sys/class/net/&{network_interface}/device/power/wakeup 2>/dev/null "
+            "|| echo disabled",
             sensors=[
                 BinarySensor(
                     SensorName.WAKE_ON_LAN,
@@ -53,39 +54,24 @@ linux = Collection(
             ],
         ),
         SensorCommand(
-            "uname -n",
-            sensors=[
-                TextSensor(
-                    SensorName.HOSTNAME,
-                    SensorKey.HOSTNAME,
-                ),
-            ],
-        ),
-        SensorCommand(
-            "uname -m",
-            sensors=[
-                TextSensor(
-                    SensorName.MACHINE_TYPE,
-                    SensorKey.MACHINE_TYPE,
-                ),
-            ],
-        ),
-        SensorCommand(
-            "uname -s",
+            'x=$(uname -snrm) && awk \'{print $1"\\n"$2"\\n"$3"\\n"$4}\' <<<$x',
             sensors=[
                 TextSensor(
                     SensorName.OS_NAME,
                     SensorKey.OS_NAME,
                 ),
-            ],
-        ),
-        SensorCommand(
-            "uname -r",
-            sensors=[
+                TextSensor(
+                    SensorName.HOSTNAME,
+                    SensorKey.HOSTNAME,
+                ),
                 TextSensor(
                     SensorName.OS_VERSION,
                     SensorKey.OS_VERSION,
                 ),
+                TextSensor(
+                    SensorName.MACHINE_TYPE,
+                    SensorKey.MACHINE_TYPE,
+                ),
             ],
         ),
         SensorCommand(
@@ -115,12 +101,12 @@ linux = Collection(
             ],
         ),
         SensorCommand(
-            'x=$(cat /proc/cpuinfo) && awk -F ": " \''
+            'awk -F ": " \''
             "/^model name/ {a=$2} "
             "/^processor/ {b=$2+1} "
             "/^Hardware/ {c=$2} "
             "/^Model/ {d=$2} "
-            'END {print a"\\n"b"\\n"c"\\n"d}\' <<<$x',
+            'END {print a"\\n"b"\\n"c"\\n"d}\' /proc/cpuinfo',
             sensors=[
                 TextSensor(
                     SensorName.CPU_NAME,
@@ -141,24 +127,22 @@ linux = Collection(
             ],
         ),
         SensorCommand(
-            "x=$(free -k) && awk '/^Mem:/ {print $2}' <<<$x",
+            "awk '"
+            "/^MemTotal:/ {a=$2} "
+            "/^MemFree:/ {b=$2} "
+            'END {print a"\\n"b}\' /proc/meminfo',
+            interval=30,
             sensors=[
                 NumberSensor(
                     SensorName.TOTAL_MEMORY,
                     SensorKey.TOTAL_MEMORY,
                     unit="KiB",
-                )
-            ],
-        ),
-        SensorCommand(
-            "x=$(free -k) && awk '/^Mem:/ {print $4}' <<<$x",
-            interval=30,
-            sensors=[
+                ),
                 NumberSensor(
                     SensorName.FREE_MEMORY,
                     SensorKey.FREE_MEMORY,
                     unit="KiB",
-                )
+                ),
             ],
         ),
         SensorCommand(
@@ -191,8 +175,10 @@ linux = Collection(
             ],
         ),
         SensorCommand(
-            "for x in $(ls -d /sys/class/thermal/thermal_zone*); do "
-            "echo $(cat $x/type),$(($(cat $x/temp)/1000)); done",
+            "awk '{"
+            'f=FILENAME; sub("type$", "temp", f); '
+            'if ((getline t < f) > 0) print $0","int(t/1000); '
+            "close(f)}' /sys/class/thermal/thermal_zone*/type 2>/dev/null || :",
             interval=60,
             separator=",",
             sensors=[
@@ -205,7 +191,7 @@ linux = Collection(
             ],
         ),
         SensorCommand(
-            "x=$(ps -e) && awk 'END {print NR-1}' <<<$x",
+            "set -- /proc/[0-9]* && echo $#",
             interval=60,
             sensors=[
                 NumberSensor(
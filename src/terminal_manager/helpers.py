@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+from functools import lru_cache
+import sys
+
 import slugify
 
 from .errors import NameKeyError
 
 
+@lru_cache(maxsize=4096)
 def name_to_key(name: str) -> str:
     """Name to key."""
     if not name:
         raise NameKeyError
 
-    return slugify.slugify(name, separator="_")
+    return sys.intern(slugify.slugify(name, separator="_"))
+
+
+def intern_key(key: str) -> str:
+    """Intern a key, subclasses of `str` can't be interned."""
+    return sys.intern(key) if type(key) is str else key
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Sequence
 from contextlib import suppress
 from dataclasses import dataclass
+from heapq import heapify, heappop, heappush
 import logging
+from time import time
 from typing import Any
 
 from .collection import Collection
-from .command import Command
+from .command import PLACEHOLDER_KEY, Command, SensorCommand
 from .default_collections.const import ActionKey, SensorKey
 from .errors import CommandError
 from .sensor import Sensor
@@ -18,9 +21,41 @@ _LOGGER = logging.getLogger(__name__)
 DEFAULT_NAME = "Manager"
 DEFAULT_COMMAND_TIMEOUT = 15
 DEFAULT_ALLOW_TURN_OFF = False
+DEFAULT_MAX_CONCURRENT_COMMANDS = 1
+DEFAULT_PIPELINE_COMMANDS = False
 
+PIPELINE_SEPARATOR = "__terminal_manager_pipeline__"
 
-@dataclass(frozen=True)
+PollPlan = tuple[tuple[Sensor, ...], tuple[SensorCommand, ...]]
+
+_NULL_SENSOR = Sensor(key=PLACEHOLDER_KEY)
+
+
+def _last_known_value(sensor_key: str) -> property:
+    def getter(manager: Manager) -> Any | None:
+        return manager._sensors_by_key.get(sensor_key, _NULL_SENSOR).last_known_value
+
+    return property(getter)
+
+
+def _split_pipeline_stdout(stdout: list[str]) -> list[tuple[list[str], int]]:
+    segments = []
+    lines = []
+
+    for line in stdout:
+        head, separator, code = line.rpartition(PIPELINE_SEPARATOR)
+        if not separator:
+            lines.append(line)
+            continue
+        if head:
+            lines.append(head)
+        segments.append((lines, int(code)))
+        lines = []
+
+    return segments
+
+
+@dataclass(frozen=True, slots=True)
 class CommandOutput:
     command_string: str
     timestamp: float
@@ -30,16 +65,31 @@ class CommandOutput:
 
 
 class Manager(Collection, Synchronizer):
+    __slots__ = (
+        "lock",
+        "semaphore",
+        "command_timeout",
+        "allow_turn_off",
+        "logger",
+        "pipeline_commands",
+        "_poll_plans",
+        "_poll_plans_version",
+        "_update_heap",
+        "_update_heap_version",
+    )
+
     def __init__(
         self,
         *,
         name: str = DEFAULT_NAME,
         command_timeout: int = DEFAULT_COMMAND_TIMEOUT,
         allow_turn_off: bool = DEFAULT_ALLOW_TURN_OFF,
+        max_concurrent_commands: int = DEFAULT_MAX_CONCURRENT_COMMANDS,
+        pipeline_commands: bool = DEFAULT_PIPELINE_COMMANDS,
         collection: Collection | None = None,
         logger: logging.Logger = _LOGGER,
     ) -> None:
-        Synchronizer.__init__(self)
+        Synchronizer.__init__(self, max_concurrent_commands)
         Collection.__init__(
             self,
             name,
@@ -49,6 +99,11 @@ class Manager(Collection, Synchronizer):
         self.command_timeout = command_timeout
         self.allow_turn_off = allow_turn_off
         self.logger = logger
+        self.pipeline_commands = pipeline_commands
+        self._poll_plans: dict[tuple[str, ...], PollPlan] = {}
+        self._poll_plans_version = self._sensor_index_version
+        self._update_heap: list[tuple[float, int, SensorCommand]] = []
+        self._update_heap_version: int | None = None
 
     async def __aenter__(self):
         return self
@@ -56,79 +111,73 @@ class Manager(Collection, Synchronizer):
     async def __aexit__(self, *args):
         await self.async_close()
 
-    @property
-    def network_interface(self) -> str | None:
-        return self._last_known_value_or_none(SensorKey.NETWORK_INTERFACE)
-
-    @property
-    def mac_address(self) -> str | None:
-        return self._last_known_value_or_none(SensorKey.MAC_ADDRESS)
-
-    @property
-    def wake_on_lan(self) -> bool | None:
-        return self._last_known_value_or_none(SensorKey.WAKE_ON_LAN)
-
-    @property
-    def machine_type(self) -> str | None:
-        return self._last_known_value_or_none(SensorKey.MACHINE_TYPE)
-
-    @property
-    def hostname(self) -> str | None:
-        return self._last_known_value_or_none(SensorKey.HOSTNAME)
-
-    @property
-    def os_name(self) -> str | None:
-        return self._last_known_value_or_none(SensorKey.OS_NAME)
-
-    @property
-    def os_version(self) -> str | None:
-        return self._last_known_value_or_none(SensorKey.OS_VERSION)
-
-    @property
-    def os_architecture(self) -> str | None:
-        return self._last_known_value_or_none(SensorKey.OS_ARCHITECTURE)
-
-    @property
-    def device_name(self) -> str | None:
-        return self._last_known_value_or_none(SensorKey.DEVICE_NAME)
-
-    @property
-    def device_model(self) -> str | None:
-        return self._last_known_value_or_none(SensorKey.DEVICE_MODEL)
-
-    @property
-    def manufacturer(self) -> str | None:
-        return self._last_known_value_or_none(SensorKey.MANUFACTURER)
-
-    @property
-    def serial_number(self) -> str | None:
-        return self._last_known_value_or_none(SensorKey.SERIAL_NUMBER)
-
-    @property
-    def cpu_name(self) -> str | None:
-        return self._last_known_value_or_none(SensorKey.CPU_NAME)
-
-    @property
-    def cpu_cores(self) -> int | None:
-        return self._last_known_value_or_none(SensorKey.CPU_CORES)
-
-    @property
-    def cpu_hardware(self) -> str | None:
-        return self._last_known_value_or_none(SensorKey.CPU_HARDWARE)
-
-    @property
-    def cpu_model(self) -> str | None:
-        return self._last_known_value_or_none(SensorKey.CPU_MODEL)
-
-    def _last_known_value_or_none(self, sensor_key: str) -> Any | None:
-        if sensor := self.sensors_by_key.get(sensor_key):
-            return sensor.last_known_value
-
-        return None
+    network_interface = _last_known_value(SensorKey.NETWORK_INTERFACE)
+    mac_address = _last_known_value(SensorKey.MAC_ADDRESS)
+    wake_on_lan = _last_known_value(SensorKey.WAKE_ON_LAN)
+    machine_type = _last_known_value(SensorKey.MACHINE_TYPE)
+    hostname = _last_known_value(SensorKey.HOSTNAME)
+    os_name = _last_known_value(SensorKey.OS_NAME)
+    os_version = _last_known_value(SensorKey.OS_VERSION)
+    os_architecture = _last_known_value(SensorKey.OS_ARCHITECTURE)
+    device_name = _last_known_value(SensorKey.DEVICE_NAME)
+    device_model = _last_known_value(SensorKey.DEVICE_MODEL)
+    manufacturer = _last_known_value(SensorKey.MANUFACTURER)
+    serial_number = _last_known_value(SensorKey.SERIAL_NUMBER)
+    cpu_name = _last_known_value(SensorKey.CPU_NAME)
+    cpu_cores = _last_known_value(SensorKey.CPU_CORES)
+    cpu_hardware = _last_known_value(SensorKey.CPU_HARDWARE)
+    cpu_model = _last_known_value(SensorKey.CPU_MODEL)
+
+    def _make_poll_plan(self, keys: Sequence[str]) -> PollPlan:
+        sensors = tuple(map(self._sensors_by_key.__getitem__, keys))
+        commands = map(self._sensor_commands_by_sensor_key.__getitem__, keys)
+        commands_by_id = {id(command): command for command in commands}
+        return sensors, tuple(commands_by_id.values())
+
+    def _get_poll_plan(self, keys: Sequence[str]) -> PollPlan:
+        if not isinstance(keys, tuple):
+            return self._make_poll_plan(keys)
+
+        if self._poll_plans_version != self._sensor_index_version:
+            self._poll_plans.clear()
+            self._poll_plans_version = self._sensor_index_version
+
+        if (plan := self._poll_plans.get(keys)) is None:
+            plan = self._poll_plans[keys] = self._make_poll_plan(keys)
+
+        return plan
+
+    def _get_update_heap(self) -> list[tuple[float, int, SensorCommand]]:
+        if self._update_heap_version != self._sensor_index_version:
+            self._update_heap = [
+                (command.next_update, i, command)
+                for i, command in enumerate(self._sensor_commands_tuple)
+                if command.interval
+            ]
+            heapify(self._update_heap)
+            self._update_heap_version = self._sensor_index_version
+
+        return self._update_heap
+
+    def _create_command_tasks(
+        self, commands: Sequence[Command]
+    ) -> list[asyncio.Task[CommandOutput]]:
+        # Not a coroutine function, so it isn't wrapped with the lock.
+        # The tasks share the lock of the calling task, other tasks
+        # created in the meantime still have to wait for it.
+        tasks = [
+            asyncio.create_task(self.async_execute_command(command))
+            for command in commands
+        ]
+
+        for task in tasks:
+            self.lock.share(task)
+
+        return tasks
 
     def reset_sensors(self) -> None:
         """Set the value of all sensors to `None`."""
-        for command in self.sensor_commands:
+        for command in self._sensor_commands_tuple:
             command.update_sensors(self, None)
 
     async def async_close(self) -> None:
@@ -138,11 +187,46 @@ class Manager(Collection, Synchronizer):
         """Update the sensor commands.
 
         Execute sensor commands that passed their `interval` or
-        all sensor commands with `force=True`.
+        all sensor commands with `force=True`. With `pipeline_commands=True`,
+        they are executed as a single command string. A changed `interval`
+        is read when the previous due time has passed or the sensor
+        commands change.
         """
-        for command in self.sensor_commands:
-            if not (force or command.should_update):
-                return
+        if force:
+            await self._async_execute_sensor_commands(self._sensor_commands_tuple)
+            return
+
+        heap = self._get_update_heap()
+        now = time()
+        due_entries = []
+
+        while heap and heap[0][0] <= now:
+            entry = heappop(heap)
+            if (next_update := entry[2].next_update) is None:
+                continue
+            if next_update > now:
+                heappush(heap, (next_update, *entry[1:]))
+                continue
+            due_entries.append(entry)
+
+        try:
+            await self._async_execute_sensor_commands(
+                [command for _, _, command in due_entries]
+            )
+        finally:
+            for _, i, command in due_entries:
+                if (next_update := command.next_update) is not None:
+                    heappush(heap, (next_update, i, command))
+
+    async def _async_execute_sensor_commands(
+        self,
+        commands: Sequence[SensorCommand],
+    ) -> None:
+        if self.pipeline_commands and len(commands) > 1:
+            await self.async_execute_pipeline(commands)
+            return
+
+        for command in commands:
             with suppress(CommandError):
                 await self.async_execute_command(command)
 
@@ -187,6 +271,85 @@ class Manager(Collection, Synchronizer):
 
         return output
 
+    async def async_execute_pipeline(
+        self,
+        commands: Sequence[SensorCommand],
+    ) -> list[CommandOutput | CommandError]:
+        """Execute sensor commands as a single command string.
+
+        The rendered commands are joined by newlines and followed by an
+        `echo` of a separator and their exit code, so a POSIX shell is
+        required. The stderr lines can't be assigned to the commands and
+        are dropped. The timeout is the sum of the command timeouts.
+        Return an output or error for each command.
+        """
+        results: list[CommandOutput | CommandError | None] = [None] * len(commands)
+        strings_by_index = {}
+        polled_sensors = None
+
+        if required_sensors := {
+            key for command in commands for key in command.required_sensors
+        }:
+            # Commands poll their required sensors themselves if this fails
+            with suppress(Exception):
+                sensors = await self.async_poll_sensors(tuple(required_sensors))
+                polled_sensors = {sensor.key: sensor for sensor in sensors}
+
+        for i, command in enumerate(commands):
+            try:
+                strings_by_index[i] = await command.async_render(
+                    self, polled_sensors=polled_sensors
+                )
+            except CommandError as exc:
+                self.logger.debug("%s: %s => %s", self.name, command.string, exc)
+                command.update_sensors(self, None)
+                results[i] = exc
+
+        if not strings_by_index:
+            return results
+
+        string = "\n".join(
+            f"{command_string}\necho {PIPELINE_SEPARATOR}$?"
+            for command_string in strings_by_index.values()
+        )
+
+        timeout = sum(
+            commands[i].timeout or self.command_timeout for i in strings_by_index
+        )
+
+        try:
+            async with self.semaphore:
+                output = await self.async_execute_command_string(string, timeout)
+            segments = _split_pipeline_stdout(output.stdout)
+        except (CommandError, ValueError) as exc:
+            error = CommandError("Failed to execute pipeline", exc)
+            segments = []
+        else:
+            error = CommandError("Pipeline output incomplete")
+
+        for j, (i, string) in enumerate(strings_by_index.items()):
+            command = commands[i]
+            if j >= len(segments):
+                self.logger.debug("%s: %s => %s", self.name, string, error)
+                command.update_sensors(self, None)
+                results[i] = error
+                continue
+            stdout, code = segments[j]
+            command_output = CommandOutput(string, output.timestamp, stdout, [], code)
+            self.logger.debug(
+                "%s: %s => %s, %s, %s", self.name, string, stdout, [], code
+            )
+            command.update_sensors(self, command_output)
+            try:
+                if linked_sensors := command.linked_sensors:
+                    await self.async_poll_sensors(linked_sensors, raise_errors=True)
+            except CommandError as exc:
+                results[i] = exc
+            else:
+                results[i] = command_output
+
+        return results
+
     async def async_run_action(
         self,
         key: str,
@@ -215,7 +378,7 @@ class Manager(Collection, Synchronizer):
             CommandError (only with `raise_errors=True`)
 
         """
-        sensors = await self.async_poll_sensors([key], raise_errors=raise_errors)
+        sensors = await self.async_poll_sensors((key,), raise_errors=raise_errors)
         return sensors[0]
 
     async def async_poll_sensors(
@@ -226,22 +389,33 @@ class Manager(Collection, Synchronizer):
     ) -> list[Sensor]:
         """Poll multiple sensors.
 
+        The sensors and commands to poll are cached for tuples of keys.
+        With `pipeline_commands=True`, the sensor commands are executed
+        as a single command string.
+
         Raises:
             KeyError
             CommandError (only with `raise_errors=True`)
 
         """
-        sensors = [self.get_sensor(key) for key in keys]
-        commands = [self.get_sensor_command(key) for key in set(keys)]
-
-        for command in commands:
-            try:
-                await self.async_execute_command(command)
-            except CommandError:
+        sensors, commands = self._get_poll_plan(keys)
+
+        if self.pipeline_commands and len(commands) > 1:
+            results = await self.async_execute_pipeline(commands)
+        else:
+            results = await asyncio.gather(
+                *self._create_command_tasks(commands),
+                return_exceptions=True,
+            )
+
+        for result in results:
+            if isinstance(result, CommandError):
                 if raise_errors:
-                    raise
+                    raise result
+            elif isinstance(result, BaseException):
+                raise result
 
-        return sensors
+        return list(sensors)
 
     async def async_set_sensor_value(
         self,
@@ -281,6 +455,7 @@ class Manager(Collection, Synchronizer):
 
         """
         sensors = await self.async_poll_sensors(keys, raise_errors=raise_errors)
+        changed_keys = []
 
         for i, sensor in enumerate(sensors):
             if sensor.value is None:
@@ -289,13 +464,20 @@ class Manager(Collection, Synchronizer):
                 value = values[i](sensor.value)
             else:
                 value = values[i]
+            changed = value != sensor.value
             try:
                 await sensor.async_set(self, value)
             except (TypeError, ValueError, CommandError):
                 if raise_errors:
                     raise
+                continue
+            if changed:
+                changed_keys.append(keys[i])
+
+        if changed_keys:
+            await self.async_poll_sensors(changed_keys, raise_errors=raise_errors)
 
-        return await self.async_poll_sensors(keys, raise_errors=raise_errors)
+        return sensors
 
     async def async_turn_off(self) -> CommandOutput:
         """Turn off by running the `TURN_OFF` action.
@@ -1,21 +1,22 @@
 from __future__ import annotations
 
 from collections.abc import Callable
+from copy import copy
 from dataclasses import KW_ONLY, dataclass, field, replace
 import re
 from typing import TYPE_CHECKING, Any
 
 from .errors import InvalidSensorError
 from .event import Event
-from .helpers import name_to_key
+from .helpers import intern_key, name_to_key
 
 if TYPE_CHECKING:
     from .collection import Collection
     from .command import Command, DynamicData
     from .manager import Manager
 
-TRUE_STRINGS = ["true", "enabled", "on", "active", "1"]
-FALSE_STRINGS = ["false", "disabled", "off", "inactive", "0"]
+TRUE_STRINGS = frozenset(("true", "enabled", "on", "active", "1"))
+FALSE_STRINGS = frozenset(("false", "disabled", "off", "inactive", "0"))
 
 
 @dataclass
@@ -31,7 +32,7 @@ class Sensor:
 
     def __post_init__(self):
         self.id = None
-        self.key = self.key or name_to_key(self.name)
+        self.key = intern_key(self.key) if self.key else name_to_key(self.name)
         self.value: Any | None = None
         self.last_known_value: Any | None = None
         self.child_sensors: list[Sensor] = []
@@ -128,6 +129,21 @@ class Sensor:
             else:
                 self._remove_child(child)
 
+    def clone(self) -> Sensor:
+        """Clone without sharing mutable state or subscribers.
+
+        `attributes` is copied shallowly, nested values are shared.
+        """
+        clone = copy(self)
+        clone.attributes = {**self.attributes}
+        clone.command_set = self.command_set.clone() if self.command_set else None
+        clone.child_sensors = [child.clone() for child in self.child_sensors]
+        clone.on_update = Event()
+        clone.on_child_add = Event()
+        clone.on_child_remove = Event()
+        clone._linked_sensors = {*self._linked_sensors}
+        return clone
+
     def check(self, collection: Collection) -> None:
         """Check configuration.
 
@@ -200,6 +216,11 @@ class TextSensor(Sensor):
         if self.options and value not in self.options:
             raise ValueError(f"{value} is not in {self.options}")
 
+    def clone(self) -> TextSensor:
+        clone: TextSensor = super().clone()
+        clone.options = [*self.options] if self.options is not None else None
+        return clone
+
 
 @dataclass
 class NumberSensor(Sensor):
@@ -212,7 +233,10 @@ class NumberSensor(Sensor):
         if self.float:
             return float(value_string)
 
-        return int(float(value_string))
+        try:
+            return int(value_string)
+        except ValueError:
+            return int(float(value_string))
 
     def _validate(self, value: Any) -> None:
         if self.float and not isinstance(value, float):
@@ -265,10 +289,12 @@ class BinarySensor(Sensor):
             if not self.payload_on:
                 return True
 
-        if value_string.lower() in TRUE_STRINGS:
+        lower_value_string = value_string.lower()
+
+        if lower_value_string in TRUE_STRINGS:
             return True
 
-        if value_string.lower() in FALSE_STRINGS:
+        if lower_value_string in FALSE_STRINGS:
             return False
 
         raise ValueError(f"Can't generate bool from {value_string}")
@@ -277,6 +303,12 @@ class BinarySensor(Sensor):
         if not isinstance(value, bool):
             raise TypeError(f"{value} is {type(value)} and not {bool}")
 
+    def clone(self) -> BinarySensor:
+        clone: BinarySensor = super().clone()
+        clone.command_on = self.command_on.clone() if self.command_on else None
+        clone.command_off = self.command_off.clone() if self.command_off else None
+        return clone
+
 
 @dataclass
 class VersionSensor(Sensor):
@@ -19,10 +19,15 @@ class AsyncRLock(asyncio.Lock):
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self._task = None
+        self._shared_tasks: set[asyncio.Task] = set()
         self._depth = 0
 
+    def _is_owner(self) -> bool:
+        task = asyncio.current_task()
+        return task is self._task or task in self._shared_tasks
+
     async def acquire(self) -> None:
-        if self._task is None or self._task != asyncio.current_task():
+        if self._task is None or not self._is_owner():
             await super().acquire()
             self._task = asyncio.current_task()
             assert self._depth == 0
@@ -36,11 +41,26 @@ class AsyncRLock(asyncio.Lock):
         if self._depth == 0:
             super().release()
             self._task = None
+            self._shared_tasks.clear()
+
+    def share(self, task: asyncio.Task) -> None:
+        """Let a task enter the lock while the current task holds it.
+
+        Raises:
+            RuntimeError
+
+        """
+        if self._task is None or not self._is_owner():
+            raise RuntimeError("Lock is not held by the current task")
+
+        self._shared_tasks.add(task)
+        task.add_done_callback(self._shared_tasks.discard)
 
 
 class Synchronizer:
-    def __init__(self) -> None:
+    def __init__(self, max_concurrency: int = 1) -> None:
         self.lock = AsyncRLock()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
 
     def __init_subclass__(cls, **kwargs):
         for name in cls.__dict__:
@@ -0,0 +1,137 @@
+import pytest
+
+from terminal_manager import (
+    ActionCommand,
+    Collection,
+    CommandLoopError,
+    InvalidSensorError,
+    SensorCommand,
+    TextSensor,
+)
+
+
+def test_add_sensor_command_restores_replaced_sensors_when_check_fails():
+    collection = Collection(
+        "test",
+        sensor_commands=[
+            SensorCommand("echo a", sensors=[TextSensor("A"), TextSensor("B")])
+        ],
+    )
+    command = collection.sensor_commands[0]
+    sensor = collection.sensors_by_key["a"]
+    invalid_sensor = TextSensor("A")
+    invalid_sensor.linked_sensors.add("x")
+
+    with pytest.raises(InvalidSensorError):
+        collection.add_sensor_command(SensorCommand("echo a", sensors=[invalid_sensor]))
+
+    assert collection.sensor_commands == (command,)
+    assert collection.sensors_by_key["a"] is sensor
+    assert collection.sensor_commands_by_sensor_key["a"] is command
+    assert command.sensors_by_key.keys() == {"a", "b"}
+
+
+def test_add_action_command_restores_replaced_command_when_check_fails():
+    collection = Collection(
+        "test",
+        action_commands=[
+            ActionCommand("echo a", "A"),
+            ActionCommand("echo b", "B"),
+        ],
+    )
+    collection.add_sensor_command(
+        SensorCommand("echo &{d}", sensors=[TextSensor("C")]), check=False
+    )
+    collection.add_sensor_command(
+        SensorCommand("echo &{c}", sensors=[TextSensor("D")]), check=False
+    )
+    commands = collection.action_commands
+
+    with pytest.raises(CommandLoopError):
+        collection.add_action_command(ActionCommand("echo &{c}", "A"))
+
+    assert collection.action_commands == commands
+
+
+def test_add_commands_without_check():
+    collection = Collection("test")
+    sensor = TextSensor("A")
+    sensor.linked_sensors.add("b")
+    collection.add_sensor_command(
+        SensorCommand("echo a", sensors=[sensor]), check=False
+    )
+    collection.add_sensor_command(
+        SensorCommand("echo b", sensors=[TextSensor("B")]), check=False
+    )
+    collection.check()
+
+    assert collection.sensors_by_key.keys() == {"a", "b"}
+
+
+def test_keys_can_be_str_subclasses():
+    class Key(str):
+        pass
+
+    collection = Collection(
+        "test",
+        action_commands=[ActionCommand("echo a", key=Key("a"))],
+        sensor_commands=[SensorCommand("echo b", sensors=[TextSensor(key=Key("b"))])],
+    )
+
+    assert collection.action_commands_by_key.keys() == {"a"}
+    assert collection.sensors_by_key.keys() == {"b"}
+
+
+def test_command_views_are_tuples():
+    collection = Collection("test")
+    collection.sensor_commands = [SensorCommand("echo a", sensors=[TextSensor("A")])]
+    collection.action_commands = [ActionCommand("echo b", "B")]
+
+    assert isinstance(collection.sensor_commands, tuple)
+    assert isinstance(collection.action_commands, tuple)
+    assert collection.sensors_by_key.keys() == {"a"}
+    assert collection.action_commands_by_key.keys() == {"b"}
+
+
+def test_collection_copies_sensor_options():
+    options = ["a", "b"]
+    collection = Collection(
+        "test",
+        sensor_commands=[
+            SensorCommand("echo a", sensors=[TextSensor("A", options=options)])
+        ],
+    )
+    collection.sensors_by_key["a"].options.append("c")
+
+    assert options == ["a", "b"]
+
+
+def test_check_allows_diamond_dependency():
+    Collection(
+        "test",
+        sensor_commands=[
+            SensorCommand("echo &{b} &{c}", sensors=[TextSensor("A")]),
+            SensorCommand("echo &{d}", sensors=[TextSensor("B")]),
+            SensorCommand("echo &{d}", sensors=[TextSensor("C")]),
+            SensorCommand("echo d", sensors=[TextSensor("D")]),
+        ],
+    )
+
+
+def test_check_raises_for_self_reference():
+    with pytest.raises(CommandLoopError):
+        Collection(
+            "test",
+            sensor_commands=[SensorCommand("echo &{a}", sensors=[TextSensor("A")])],
+        )
+
+
+def test_check_raises_for_loop():
+    with pytest.raises(CommandLoopError):
+        Collection(
+            "test",
+            sensor_commands=[
+                SensorCommand("echo &{b}", sensors=[TextSensor("A")]),
+                SensorCommand("echo &{a}", sensors=[TextSensor("B")]),
+            ],
+        )
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from test_manager import FakeManager
+
+from terminal_manager import ActionCommand, CommandError, SensorCommand, TextSensor
+
+
+def test_render_after_string_change():
+    async def run():
+        manager = FakeManager()
+        command = ActionCommand("echo @{a}", "A")
+        strings = [await command.async_render(manager, {"a": 1})]
+        command.string = "echo changed @{a}"
+        strings.append(await command.async_render(manager, {"a": 1}))
+        command.string = "plain"
+        strings.append(await command.async_render(manager))
+        return strings, command.required_variables
+
+    strings, required_variables = asyncio.run(run())
+
+    assert strings == ["echo 1", "echo changed 1", "plain"]
+    assert required_variables == frozenset()
+
+
+def test_render_variables_and_sensors():
+    async def run():
+        manager = FakeManager()
+        manager.add_sensor_command(SensorCommand("b", sensors=[TextSensor("B")]))
+        command = ActionCommand("echo @{a} &{b} @{a}", "A")
+        return await command.async_render(manager, {"a": 1})
+
+    assert asyncio.run(run()) == "echo 1 b 1"
+
+
+def test_render_missing_variable():
+    async def run():
+        await ActionCommand("echo @{a}", "A").async_render(FakeManager(), {})
+
+    with pytest.raises(CommandError):
+        asyncio.run(run())
+
+
+def test_render_keeps_placeholders_in_variable_values():
+    async def run():
+        manager = FakeManager()
+        manager.add_sensor_command(SensorCommand("x", sensors=[TextSensor("X")]))
+        command = ActionCommand("echo @{a}", "A")
+        return await command.async_render(manager, {"a": "&{x}"})
+
+    assert asyncio.run(run()) == "echo &{x}"
@@ -0,0 +1,223 @@
+import asyncio
+from time import time
+
+from terminal_manager import (
+    ActionCommand,
+    CommandError,
+    Manager,
+    SensorCommand,
+    TextSensor,
+)
+from terminal_manager.manager import PIPELINE_SEPARATOR, CommandOutput
+
+
+class FakeManager(Manager):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.events = []
+
+    async def async_execute_command_string(
+        self,
+        string: str,
+        command_timeout: int | None = None,
+    ) -> CommandOutput:
+        self.events.append(f"start {string}")
+        await asyncio.sleep(0.05 if string.endswith("b") else 0.01)
+        self.events.append(f"end {string}")
+        return CommandOutput(string, time(), [string], [], 0)
+
+    async def async_disconnect(self) -> None:
+        self.events.append("disconnect")
+
+
+def test_poll_sensors_keeps_lock_from_tasks_created_by_subscribers():
+    async def run():
+        manager = FakeManager(max_concurrent_commands=2)
+        manager.add_sensor_command(SensorCommand("echo a", sensors=[TextSensor("A")]))
+        manager.add_sensor_command(SensorCommand("echo b", sensors=[TextSensor("B")]))
+        tasks = []
+        manager.sensors_by_key["a"].on_update.subscribe(
+            lambda _: tasks.append(asyncio.create_task(manager.async_disconnect()))
+        )
+        await manager.async_poll_sensors(["a", "b"])
+        await asyncio.gather(*tasks)
+        return manager.events
+
+    events = asyncio.run(run())
+
+    assert events[-1] == "disconnect"
+    assert sorted(events[:4]) == [
+        "end echo a",
+        "end echo b",
+        "start echo a",
+        "start echo b",
+    ]
+
+
+def test_update_sensor_commands_keeps_commands_of_cancelled_update():
+    async def run():
+        manager = FakeManager()
+        manager.add_sensor_command(
+            SensorCommand("echo b", interval=1, sensors=[TextSensor("B")])
+        )
+        task = asyncio.create_task(manager.async_update_sensor_commands())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        manager.events.clear()
+        await manager.async_update_sensor_commands()
+        return manager.events
+
+    assert asyncio.run(run()) == ["start echo b", "end echo b"]
+
+
+def test_update_sensor_commands_reads_changed_interval_when_due():
+    async def run():
+        manager = FakeManager()
+        manager.add_sensor_command(
+            SensorCommand("echo b", interval=0.01, sensors=[TextSensor("B")])
+        )
+        await manager.async_update_sensor_commands()
+        manager.events.clear()
+        manager.sensor_commands[0].interval = 1000
+        await asyncio.sleep(0.02)
+        await manager.async_update_sensor_commands()
+        return manager.events
+
+    assert asyncio.run(run()) == []
+
+
+def test_execute_command_not_in_collection_with_dynamic_sensor():
+    async def run():
+        manager = FakeManager()
+        command = SensorCommand(
+            "d1,x", separator=",", sensors=[TextSensor("D", dynamic=True)]
+        )
+        await manager.async_execute_command(command)
+        return manager.events
+
+    assert asyncio.run(run()) == ["start d1,x", "end d1,x"]
+
+
+def test_poll_sensor_polls_linked_sensors_added_later():
+    async def run():
+        manager = FakeManager()
+        manager.add_sensor_command(SensorCommand("echo a", sensors=[TextSensor("A")]))
+        manager.add_sensor_command(SensorCommand("echo b", sensors=[TextSensor("B")]))
+        manager.sensors_by_key["a"].linked_sensors.add("b")
+        await manager.async_poll_sensor("a")
+        return manager.events
+
+    assert asyncio.run(run()) == [
+        "start echo a",
+        "end echo a",
+        "start echo b",
+        "end echo b",
+    ]
+
+
+class PipelineManager(Manager):
+    def __init__(self, stdout: list[str] | Exception, **kwargs) -> None:
+        super().__init__(pipeline_commands=True, **kwargs)
+        self.stdout = stdout
+        self.calls = []
+
+    async def async_execute_command_string(
+        self,
+        string: str,
+        command_timeout: int | None = None,
+    ) -> CommandOutput:
+        self.calls.append((string, command_timeout))
+        if isinstance(self.stdout, Exception):
+            raise self.stdout
+        return CommandOutput(string, time(), self.stdout, [], 0)
+
+
+def run_pipeline(manager: PipelineManager) -> list[CommandOutput | CommandError]:
+    manager.add_sensor_command(
+        SensorCommand("echo a", timeout=5, sensors=[TextSensor("A")])
+    )
+    manager.add_sensor_command(SensorCommand("echo b", sensors=[TextSensor("B")]))
+    return asyncio.run(manager.async_execute_pipeline(manager.sensor_commands))
+
+
+def test_execute_pipeline_splits_output():
+    manager = PipelineManager(
+        ["a", f"{PIPELINE_SEPARATOR}0", f"b{PIPELINE_SEPARATOR}1"], command_timeout=10
+    )
+    results = run_pipeline(manager)
+
+    assert manager.calls == [
+        (
+            f"echo a\necho {PIPELINE_SEPARATOR}$?\necho b\necho {PIPELINE_SEPARATOR}$?",
+            15,
+        )
+    ]
+    assert [(result.stdout, result.code) for result in results] == [
+        (["a"], 0),
+        (["b"], 1),
+    ]
+    assert manager.sensors_by_key["a"].value == "a"
+    assert manager.sensors_by_key["b"].value is None
+
+
+def test_execute_pipeline_with_incomplete_output():
+    manager = PipelineManager(["a", f"{PIPELINE_SEPARATOR}0", "b"])
+    results = run_pipeline(manager)
+
+    assert results[0].stdout == ["a"]
+    assert isinstance(results[1], CommandError)
+    assert manager.sensors_by_key["b"].value is None
+
+
+def test_execute_pipeline_with_error():
+    manager = PipelineManager(CommandError("Connection lost"))
+    results = run_pipeline(manager)
+
+    assert all(isinstance(result, CommandError) for result in results)
+
+
+def test_set_sensor_values_polls_written_sensors_again():
+    async def run(value):
+        manager = FakeManager()
+        manager.add_sensor_command(
+            SensorCommand(
+                "echo a",
+                sensors=[
+                    TextSensor("A", command_set=ActionCommand("set @{value}", "Set"))
+                ],
+            )
+        )
+        await manager.async_set_sensor_value("a", value)
+        return manager.events
+
+    assert asyncio.run(run("x")) == [
+        "start echo a",
+        "end echo a",
+        "start set x",
+        "end set x",
+        "start echo a",
+        "end echo a",
+    ]
+    assert asyncio.run(run("echo a")) == ["start echo a", "end echo a"]
+
+
+def test_set_sensor_values_polls_sensors_with_own_set_again():
+    class SetSensor(TextSensor):
+        async def async_set(self, manager, value):
+            await manager.async_execute_command_string(f"set {value}")
+
+    async def run():
+        manager = FakeManager()
+        manager.add_sensor_command(SensorCommand("echo a", sensors=[SetSensor("A")]))
+        await manager.async_set_sensor_value("a", "x")
+        return manager.events
+
+    assert asyncio.run(run()) == [
+        "start echo a",
+        "end echo a",
+        "start set x",
+        "end set x",
+        "start echo a",
+        "end echo a",
+    ]
@@ -0,0 +1,12 @@
+import asyncio
+
+from terminal_manager.synchronizer import Synchronizer
+
+
+def test_synchronizer_without_subclass():
+    async def run():
+        synchronizer = Synchronizer(2)
+        async with synchronizer.lock, synchronizer.semaphore:
+            return synchronizer.lock.locked()
+
+    assert asyncio.run(run())